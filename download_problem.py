@@ -20,13 +20,20 @@ from docopt import docopt
 from datetime import datetime
 from pathlib import Path
 from dataclasses import dataclass
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
 import http.server
 import json
 import subprocess
 import re
 import os
-import shutil
+import sys
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 class Colors:
     """ANSI color codes for terminal output"""
@@ -46,17 +53,27 @@ class Colors:
 
     @classmethod
     def success(cls, text: str) -> str:
-        return cls.style(text, cls.OKGREEN)
+        return cls.OKGREEN + text + cls.END
 
     @classmethod
     def error(cls, text: str) -> str:
-        return cls.style(text, cls.FAIL)
+        return cls.FAIL + text + cls.END
 
     @classmethod
     def warning(cls, text: str) -> str:
-        return cls.style(text, cls.WARNING)
-
-@dataclass
+        return cls.WARNING + text + cls.END
+
+# Known online judges, matched case-insensitively against the group name
+JUDGE_NAMES = {name.lower(): name for name in (
+    'Codeforces', 'AtCoder', 'CodeChef', 'SPOJ', 'UVA', 'Kattis', 'BRSPOJ', 'VJudge'
+)}
+# Longest names first so that e.g. BRSPOJ is not mistaken for SPOJ
+JUDGE_PATTERN = re.compile(
+    r'(?P<judge>' + '|'.join(sorted(map(re.escape, JUDGE_NAMES.values()), key=len, reverse=True)) + r')\s*-?\s*',
+    re.IGNORECASE
+)
+
+@dataclass(slots=True, frozen=True)
 class ProblemMetadata:
     """Problem metadata from Competitive Companion"""
     name: str
@@ -84,67 +101,74 @@ class ProblemMetadata:
     @staticmethod
     def format_group_name(group: str) -> str:
         """Format group name according to the online judge"""
-        # Extract the judge name from the group
-        judges = {
-            'Codeforces': r'Codeforces',
-            'AtCoder': r'AtCoder',
-            'CodeChef': r'CodeChef',
-            'SPOJ': r'SPOJ',
-            'UVA': r'UVA',
-            'Kattis': r'Kattis',
-            'BRSPOJ': r'BRSPOJ',
-            'VJudge': r'VJudge'
-        }
-
         # Remove any leading/trailing spaces and dashes
         group = group.strip(' -')
 
-        for judge, pattern in judges.items():
-            if re.search(pattern, group, re.IGNORECASE):
-                # Extract the contest part (everything after the judge name and possible dash)
-                contest_part = re.sub(f'^{pattern}\s*-?\s*', '', group, flags=re.IGNORECASE)
-                return f"{judge}/{contest_part}"
+        match = JUDGE_PATTERN.search(group)
+        if match is None:
+            # If no known judge is found, return the group name as is
+            return group
 
-        # If no known judge is found, return the group name as is
-        return group
+        # Extract the contest part (everything after the judge name and possible dash)
+        judge = JUDGE_NAMES[match['judge'].lower()]
+        contest_part = group[match.end():] if match.start() == 0 else group
+        return f"{judge}/{contest_part}"
 
 class ProblemHandler:
     """Handles problem creation and file management"""
     
     TEMPLATE_FILE = '/home/parallels/Sublime/template.cc'
+    GEN_CF_FILE = '/home/parallels/Sublime/gen_cf.py'
+    HEADER_TIME_FORMAT = "%d/%m/%Y às %H:%M:%S"
+    HEADER_TEMPLATE = (
+        "// author: glaucoacassioc\n"
+        "// created on: {time}\n"
+        "\n"
+        "// Problem: {name}\n"
+        "// URL: {url}\n"
+        "// Time Limit: {time_limit} ms\n"
+        "// Memory Limit: {memory_limit} MB\n"
+        "\n"
+    )
     
     def __init__(self, base_dir: Path = Path('.')):
         self.base_dir = base_dir
         self.created_files = []  # Changed to list to track individual files
         self.failed_files = []
+        self.cc_files_per_dir: Dict[Path, List[Path]] = {}  # Source files to open in Sublime
 
-    def generate_file_header(self, metadata: ProblemMetadata) -> str:
-        """Generate file header with problem information"""
-        current_time = datetime.now().strftime("%d/%m/%Y às %H:%M:%S")
-        return f"""// author: glaucoacassioc
-// created on: {current_time}
+        # Load the template once instead of copying it from disk for every problem
+        try:
+            self._template = Path(self.TEMPLATE_FILE).read_bytes()
+        except OSError as e:
+            self._template = None
+            print(Colors.error(f"Failed to read template {self.TEMPLATE_FILE}: {e}"))
 
-// Problem: {metadata.name}
-// URL: {metadata.url}
-// Time Limit: {metadata.time_limit} ms
-// Memory Limit: {metadata.memory_limit} MB
+        # Same for the generator script copied next to every problem
+        try:
+            self._gen_cf = Path(self.GEN_CF_FILE).read_bytes()
+        except OSError:
+            self._gen_cf = None
 
-"""
+    def generate_file_header(self, metadata: ProblemMetadata) -> str:
+        """Generate file header with problem information"""
+        return self.HEADER_TEMPLATE.format_map({
+            'time': datetime.now().strftime(self.HEADER_TIME_FORMAT),
+            'name': metadata.name,
+            'url': metadata.url,
+            'time_limit': metadata.time_limit,
+            'memory_limit': metadata.memory_limit,
+        })
 
     def create_problem_files(self, metadata: ProblemMetadata, manual_mode: bool = False) -> None:
         """Create all necessary problem files"""
+        # Messages are collected and written in one go once the problem is done
+        log_lines = []
         try:
             # Create contest directory
             contest_dir = self.base_dir / metadata.group
             contest_dir.mkdir(parents=True, exist_ok=True)
-            
-            # Track created directories
-            if not contest_dir.exists():
-                for parent in contest_dir.parents:
-                    if not parent.exists():
-                        self.created_files.append(str(parent))
-                self.created_files.append(str(contest_dir))
-            
+
             # Extract problem letter/number from the name
             problem_id = metadata.name.split()[0].split('.')[0]
             
@@ -155,71 +179,86 @@ class ProblemHandler:
                 file_name = f"{problem_id}.cc"
                 source_file = contest_dir / file_name
 
-            if not source_file.exists():
-                shutil.copyfile(self.TEMPLATE_FILE, source_file)
-                with open(source_file, 'r+') as f:
-                    content = f.read()
-                    f.seek(0)
-                    f.write(self.generate_file_header(metadata) + content)
-                self.created_files.append(str(source_file))
-                print(Colors.success(f"Create mode {source_file}"))
+            if self._template is not None:
+                header = self.generate_file_header(metadata).encode('utf-8')
+                if self._write_if_new(source_file, header + self._template):
+                    self.created_files.append(str(source_file))
+                    log_lines.append(Colors.success(f"Create mode {source_file}"))
+            elif not source_file.exists():
+                raise FileNotFoundError(f"template {self.TEMPLATE_FILE} is not available")
 
             # Copy gen_cf.py to the contest directory
-            gen_cf_source = Path('/home/parallels/Sublime/gen_cf.py')
+            gen_cf_source = self.GEN_CF_FILE
             gen_cf_dest = contest_dir / 'gen_cf.py'
             
-            if gen_cf_source.exists():
-                shutil.copyfile(gen_cf_source, gen_cf_dest)
+            if self._gen_cf is not None:
+                gen_cf_dest.write_bytes(self._gen_cf)
                 self.created_files.append(str(gen_cf_dest))
                 #print(Colors.success(f"Create mode {gen_cf_dest}"))
             else:
-                print(Colors.warning(f"gen_cf.py not found at {gen_cf_source}"))
+                log_lines.append(Colors.warning(f"gen_cf.py not found at {gen_cf_source}"))
 
             # Create test cases
-            self._save_test_cases(contest_dir, metadata.tests, problem_id)
+            self._save_test_cases(contest_dir, metadata.tests, problem_id, log_lines)
             
-            # Abrir arquivos e pasta no Sublime
-            self.open_in_sublime(contest_dir)
+            # Abrir arquivos e pasta no Sublime depois de baixar tudo
+            self.cc_files_per_dir.setdefault(contest_dir, []).append(source_file)
             
         except Exception as e:
-            print(Colors.error(f"Failed to make problem {metadata.name}: {e}"))
+            log_lines.append(Colors.error(f"Failed to make problem {metadata.name}: {e}"))
             self.failed_files.append(metadata.name)
 
-    def _save_test_cases(self, contest_dir: Path, tests: List[Dict[str, str]], problem_id: str) -> None:
+        if log_lines:
+            sys.stdout.write('\n'.join(log_lines) + '\n')
+
+    def _save_test_cases(self, contest_dir: Path, tests: List[Dict[str, str]], problem_id: str,
+                         log_lines: List[str]) -> None:
         """Save test cases to files using problem ID as prefix"""
+        # Collect every pending file first, then write them in a single pass
+        pending = []
         for i, test in enumerate(tests, 1):
-            # Create input file
-            in_file = contest_dir / f'{problem_id}-{i}.in'
-            if not in_file.exists():
-                with open(in_file, 'w') as f:
-                    f.write(test['input'])
-                self.created_files.append(str(in_file))
-                print(Colors.success(f"Create input file: {in_file}"))
-
-            # Create output file
-            out_file = contest_dir / f'{problem_id}-{i}.out'
-            if not out_file.exists():
-                with open(out_file, 'w') as f:
-                    f.write(test['output'])
-                self.created_files.append(str(out_file))
-                print(Colors.success(f"Create output file: {out_file}"))
-
-    def open_in_sublime(self, directory: Path):
-        """Open the created problem directory in Sublime Text"""
+            pending.append(('input', contest_dir / f'{problem_id}-{i}.in', test['input']))
+            pending.append(('output', contest_dir / f'{problem_id}-{i}.out', test['output']))
+
+        for kind, path, payload in pending:
+            if self._write_if_new(path, payload.encode('utf-8')):
+                self.created_files.append(str(path))
+                log_lines.append(Colors.success(f"Create {kind} file: {path}"))
+
+    @staticmethod
+    def _write_if_new(path: Path, data: bytes) -> bool:
+        """Create a file with the given content, unless it already exists"""
+        # O_EXCL checks for existence and creates the file in a single call
         try:
-            # Listar arquivos .cc no diretório e ordenar
-            cc_files = sorted(
-                list(directory.rglob('*.cc')), 
-                key=lambda f: f.name  # Ordena pelo nome do arquivo
-            )
-            
-            # Comando para abrir Sublime com a pasta do contest
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        return True
+
+    def open_in_sublime(self):
+        """Open every created problem directory in Sublime Text with a single command"""
+        try:
+            folders = {}  # Ordered set of folders to add to the window
+            cc_files = []
+            for directory in sorted(self.cc_files_per_dir):
+                # Arquivos .cc criados no diretório, ordenados pelo nome
+                files = sorted(set(self.cc_files_per_dir[directory]), key=lambda f: f.name)
+                folders.setdefault(str(directory))
+                cc_files.extend(str(f) for f in files)
+
+            # Comando para abrir Sublime com as pastas dos contests
             # e adicionar todos os arquivos .cc em abas
+            # Sublime keeps running on its own, so don't wait for it
             if cc_files:
-                subprocess.run(['subl', '-a', str(directory)] + [str(f) for f in cc_files], check=True)
-            else:
-                print(Colors.warning(f"No .cc file found in the directory {directory}"))
-        except subprocess.CalledProcessError as e:
+                subprocess.Popen(
+                    ['subl', '-a', *folders, *cc_files],
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                    start_new_session=True
+                )
+        except OSError as e:
             print(f"Error while executing Sublime command: {e}")
         except Exception as e:
             print(f"Unknown error while opening Sublime: {e}")
@@ -233,61 +272,89 @@ class ProblemHandler:
 
 class CompetitiveCompanionServer:
     """Server to receive problems from Competitive Companion"""
-    
+
+    class Server(http.server.HTTPServer):
+        # A whole contest is posted at once, so leave room to queue every problem
+        request_queue_size = 128
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_POST(self):
+            length = self.headers.get('Content-Length')
+            if length is None:
+                self.server.json_data = json.load(self.rfile)
+            else:
+                # Read the whole body in one call instead of letting the parser pull it piecewise
+                raw = self.rfile.read(int(length))
+                self.server.json_data = orjson.loads(raw) if orjson else json.loads(raw)
+            self.send_response(200)
+            self.end_headers()
+
     def __init__(self, port: int = 10046):
         self.port = port
-        
-    def listen_once(self, timeout: Optional[float] = None) -> Optional[dict]:
-        """Listen for one problem submission"""
-        json_data = None
+        self._server: Optional[CompetitiveCompanionServer.Server] = None
+
+    def __enter__(self) -> 'CompetitiveCompanionServer':
+        self.open()
+        return self
 
-        class Handler(http.server.BaseHTTPRequestHandler):
-            def do_POST(self):
-                nonlocal json_data
-                json_data = json.load(self.rfile)
-                self.send_response(200)
-                self.end_headers()
+    def __exit__(self, *exc_info) -> None:
+        self.close()
 
-        with http.server.HTTPServer(('127.0.0.1', self.port), Handler) as server:
-            server.timeout = timeout
-            server.handle_request()
+    def open(self) -> None:
+        """Bind the listening socket once, it is reused for every request"""
+        if self._server is None:
+            self._server = self.Server(('127.0.0.1', self.port), self.Handler)
 
-        return json_data
+    def close(self) -> None:
+        """Release the listening socket"""
+        if self._server is not None:
+            self._server.server_close()
+            self._server = None
+
+    def listen_once(self, timeout: Optional[float] = None) -> Optional[dict]:
+        """Listen for one problem submission"""
+        self.open()
+        self._server.json_data = None
+        self._server.timeout = timeout
+        self._server.handle_request()
+
+        return self._server.json_data
 
     def listen_many(self, *, num_items: Optional[int] = None,
                    num_batches: Optional[int] = None,
-                   timeout: Optional[float] = None) -> List[dict]:
-        """Listen for multiple problem submissions"""
+                   timeout: Optional[float] = None) -> Iterator[dict]:
+        """Listen for multiple problem submissions, yielding each one as it arrives"""
         if num_items is not None:
-            return [self.listen_once() for _ in range(num_items)]
+            for _ in range(num_items):
+                yield self.listen_once()
+            return
 
         if num_batches is not None:
-            results = []
-            batches = {}
+            batches_seen = set()
+            # Problems still expected from the batches seen so far
+            outstanding = 0
             
-            while len(batches) < num_batches or any(need for need, _ in batches.values()):
+            while len(batches_seen) < num_batches or outstanding > 0:
                 data = self.listen_once()
                 if data is None:
                     break
                     
-                results.append(data)
+                yield data
                 batch_id = data['batch']['id']
-                batch_size = data['batch']['size']
                 
-                if batch_id not in batches:
-                    batches[batch_id] = [batch_size, batch_size]
-                batches[batch_id][0] -= 1
+                if batch_id not in batches_seen:
+                    batches_seen.add(batch_id)
+                    outstanding += data['batch']['size']
+                outstanding -= 1
 
-            return results
+            return
 
-        results = [self.listen_once()]
+        yield self.listen_once()
         while True:
             data = self.listen_once(timeout=timeout)
             if data is None:
                 break
-            results.append(data)
-        
-        return results
+            yield data
 
 def print_initial_instructions():
     """Print instructions for using Competitive Companion"""
@@ -326,46 +393,46 @@ def main():
     if all(not arguments[key] for key in ['--echo', '<name>', '--number', '--batches', '--timeout']):
         print_initial_instructions()
     
-    server = CompetitiveCompanionServer()
-    handler = ProblemHandler()
+    with CompetitiveCompanionServer() as server:
+        if arguments['--echo']:
+            while True:
+                data = server.listen_once()
+                if orjson:
+                    # Already UTF-8 bytes, so skip the text layer entirely
+                    sys.stdout.buffer.write(orjson.dumps(data, option=orjson.OPT_INDENT_2) + b'\n')
+                    sys.stdout.buffer.flush()
+                else:
+                    print(json.dumps(data, indent=2))
+        else:
+            dryrun = arguments['--dryrun']
+            handler = ProblemHandler()
 
-    if arguments['--echo']:
-        while True:
-            data = server.listen_once()
-            print(json.dumps(data, indent=2))
-    else:
-        dryrun = arguments['--dryrun']
-
-        def process_problem(data: dict, manual_name: Optional[str] = None):
-            if dryrun:
-                print(f"Would create problem: {data['name']}")
-                return
+            def process_problem(data: dict, manual_name: Optional[str] = None):
+                if dryrun:
+                    print(f"Would create problem: {data['name']}")
+                    return
                 
-            metadata = ProblemMetadata.from_json(data)
-            handler.create_problem_files(metadata, manual_mode=manual_name is not None)
-
-        if names := arguments['<name>']:
-            datas = server.listen_many(num_items=len(names))
-            for data, name in zip(datas, names):
-                process_problem(data, name)
-        elif cnt := arguments['--number']:
-            datas = server.listen_many(num_items=int(cnt))
-            for data in datas:
-                process_problem(data)
-        elif batches := arguments['--batches']:
-            datas = server.listen_many(num_batches=int(batches))
-            for data in datas:
-                process_problem(data)
-        elif timeout := arguments['--timeout']:
-            datas = server.listen_many(timeout=float(timeout))
-            for data in datas:
-                process_problem(data)
-        else:
-            datas = server.listen_many(num_batches=1)
-            for data in datas:
-                process_problem(data)
+                metadata = ProblemMetadata.from_json(data)
+                handler.create_problem_files(metadata, manual_mode=manual_name is not None)
+
+            if names := arguments['<name>']:
+                datas = server.listen_many(num_items=len(names))
+            elif cnt := arguments['--number']:
+                datas = server.listen_many(num_items=int(cnt))
+            elif batches := arguments['--batches']:
+                datas = server.listen_many(num_batches=int(batches))
+            elif timeout := arguments['--timeout']:
+                datas = server.listen_many(timeout=float(timeout))
+            else:
+                datas = server.listen_many(num_batches=1)
+
+            # Problems are handed to the pool as soon as they arrive, so files are
+            # created in parallel while the rest of the contest is still being received
+            with ThreadPoolExecutor() as pool:
+                list(pool.map(process_problem, datas, names or repeat(None)))
 
-        handler.print_summary()
+            handler.open_in_sublime()
+            handler.print_summary()
 
 if __name__ == '__main__':
     main()
@@ -1,9 +1,17 @@
 #!/usr/bin/env python3
 
+import argparse
+import glob
+import json
 import os
 import re
 import sys
-from typing import Union, List
+from typing import Union, List, Optional, Tuple, Iterable, Iterator
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 class Colors:
     """ANSI color codes for terminal output"""
@@ -21,15 +29,15 @@ class Colors:
 
     @classmethod
     def success(cls, text: str) -> str:
-        return cls.style(text, cls.OKGREEN)
+        return cls.OKGREEN + text + cls.END
 
     @classmethod
     def error(cls, text: str) -> str:
-        return cls.style(text, cls.FAIL)
+        return cls.FAIL + text + cls.END
 
     @classmethod
     def warning(cls, text: str) -> str:
-        return cls.style(text, cls.WARNING)
+        return cls.WARNING + text + cls.END
 
 class TestCaseGenerator:
     def __init__(self, problem_identifier: str):
@@ -40,49 +48,130 @@ class TestCaseGenerator:
             problem_identifier (str): The identifier for the problem (from .cc filename or directory)
         """
         self.problem_identifier = problem_identifier
+        # Shared start of every test case filename, "<identifier>-"
+        self._path_prefix = problem_identifier + '-'
+        # Compiled once, matches "<identifier>-<number>.in" and captures the number
+        self._in_re = re.compile(rf'^{re.escape(problem_identifier)}-(\d+)\.in$')
+        # Next free test case number, found by scanning the directory on first use
+        self._next_num: Optional[int] = None
 
     def _get_next_test_case_number(self) -> int:
         """
         Calculate the next available test case number
         
+        The directory is only scanned once, later numbers come from the cached counter
+        
         Returns:
             int: Next available test case number, starting from 2
         """
-        existing_files = os.listdir('.')
-        test_case_numbers = [
-            int(re.search(r'-(\d+)\.in$', f).group(1))
-            for f in existing_files
-            if re.match(rf'^{re.escape(self.problem_identifier)}-\d+\.in$', f)
-        ]
-        return max(test_case_numbers, default=1) + 1
+        if self._next_num is None:
+            # glob drops unrelated files (.cc, .out, ...) with a single compiled pattern
+            # over the listing, only the candidates reach the exact regex below
+            candidates = glob.iglob(glob.escape(self._path_prefix) + '*.in')
+            self._next_num = max(
+                (int(match.group(1)) for name in candidates if (match := self._in_re.match(name))),
+                default=1
+            ) + 1
+        return self._next_num
 
-    def generate_test_case(self, input_content: Union[str, List], output_content: Union[str, List] = None):
+    @staticmethod
+    def _write_content(filename: str, content: Union[str, List]) -> None:
         """
-        Generate input and output test case files
+        Write test case content to a file, ending with a single newline
+        
+        Args:
+            filename (str): File to create or overwrite
+            content (Union[str, List]): Text, or items written one per line
+        """
+        if isinstance(content, str):
+            text = content
+        else:
+            # Materialize once so iterators such as generators are only consumed a single time
+            items = content if isinstance(content, (list, tuple)) else list(content)
+            if all(isinstance(item, str) for item in items):
+                # Lines of text (the usual case) can be joined as they are
+                text = '\n'.join(items)
+            else:
+                text = '\n'.join([str(item) for item in items])
+        # strip() hands back the same object when there is nothing to trim
+        data = text.strip().encode('utf-8')
+
+        # O_BINARY keeps Windows from turning "\n" into "\r\n" on a raw descriptor
+        flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+        fd = os.open(filename, flags, 0o666)
+        try:
+            # Payload and trailing newline go out in one scatter-gather call,
+            # so the text is never copied just to append the newline
+            written = os.writev(fd, [data, b'\n']) if hasattr(os, 'writev') else 0
+            # Short writes (or no writev, e.g. on Windows) fall back to plain writes
+            if written < len(data) + 1:
+                rest = memoryview(data + b'\n')[written:]
+                while rest:
+                    rest = rest[os.write(fd, rest):]
+        finally:
+            os.close(fd)
+
+    def _create_files(self, input_content: Union[str, List], output_content: Union[str, List],
+                      log_lines: List[str]):
+        """
+        Write the files of the next test case, recording a status line for each one
         
         Args:
             input_content (Union[str, List]): Content for input test case
-            output_content (Union[str, List], optional): Content for output test case
+            output_content (Union[str, List]): Content for output test case, or None
+            log_lines (List[str]): Status messages are appended here
         """
         # Get next test case number
         test_case_number = self._get_next_test_case_number()
 
         # Create input filename and write input content
-        input_filename = f"{self.problem_identifier}-{test_case_number}.in"
-        input_text = input_content if isinstance(input_content, str) else '\n'.join(map(str, input_content))
-        
-        with open(input_filename, 'w') as f:
-            f.write(input_text.strip() + '\n')
-        print(Colors.success(f"Created input file: {input_filename}"))
+        input_filename = f"{self._path_prefix}{test_case_number}.in"
+        self._write_content(input_filename, input_content)
+        self._next_num += 1
+        log_lines.append(Colors.success(f"Created input file: {input_filename}"))
 
         # Create output file if output content is provided
         if output_content is not None:
-            output_filename = f"{self.problem_identifier}-{test_case_number}.out"
-            output_text = output_content if isinstance(output_content, str) else '\n'.join(map(str, output_content))
-            
-            with open(output_filename, 'w') as f:
-                f.write(output_text.strip() + '\n')
-            print(Colors.success(f"Created output file: {output_filename}"))
+            output_filename = f"{self._path_prefix}{test_case_number}.out"
+            self._write_content(output_filename, output_content)
+            log_lines.append(Colors.success(f"Created output file: {output_filename}"))
+
+    @staticmethod
+    def _flush_log(log_lines: List[str]):
+        """Write all collected status lines to stdout at once"""
+        if log_lines:
+            sys.stdout.write('\n'.join(log_lines) + '\n')
+
+    def generate_test_case(self, input_content: Union[str, List], output_content: Union[str, List] = None):
+        """
+        Generate input and output test case files
+        
+        Args:
+            input_content (Union[str, List]): Content for input test case
+            output_content (Union[str, List], optional): Content for output test case
+        """
+        log_lines = []
+        try:
+            self._create_files(input_content, output_content, log_lines)
+        finally:
+            self._flush_log(log_lines)
+
+    def generate_many(self, cases: Iterable[Tuple[Union[str, List], Optional[Union[str, List]]]]):
+        """
+        Generate several test cases in one go, numbered sequentially
+        
+        The directory is scanned once for the first free number and the
+        files are then written back to back in increasing order
+        
+        Args:
+            cases (Iterable[Tuple]): (input_content, output_content) pairs, output may be None
+        """
+        log_lines = []
+        try:
+            for input_content, output_content in cases:
+                self._create_files(input_content, output_content, log_lines)
+        finally:
+            self._flush_log(log_lines)
 
 def get_problem_identifier() -> str:
     """
@@ -92,15 +181,56 @@ def get_problem_identifier() -> str:
         str: Problem identifier
     """
     # Try to find .cc file in current directory
-    cc_files = [f for f in os.listdir('.') if f.endswith('.cc')]
-    if cc_files:
-        # Use the first .cc file's name (without extension) as identifier
-        return os.path.splitext(cc_files[0])[0]
+    with os.scandir('.') as entries:
+        for entry in entries:
+            if entry.name.endswith('.cc'):
+                # Use the first .cc file's name (without extension) as identifier
+                return os.path.splitext(entry.name)[0]
     
     # If no .cc file, use current directory name
     return os.path.basename(os.getcwd())
 
+def read_bulk_cases(path: str) -> Iterator[Tuple[Union[str, List], Optional[Union[str, List]]]]:
+    """
+    Stream test cases from an NDJSON file
+    
+    Args:
+        path (str): File with one {"in": ..., "out": ...} object per line, "out" is optional
+    
+    Returns:
+        Iterator[Tuple]: (input_content, output_content) pairs
+    
+    Raises:
+        ValueError: If a line is not valid JSON or a record has a bad field,
+            the message names the line number
+    """
+    loads = orjson.loads if orjson else json.loads
+    with open(path, 'rb') as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+
+            try:
+                record = loads(line)
+            except ValueError as e:
+                raise ValueError(f"{path}:{line_number}: invalid JSON ({e})") from None
+            if not isinstance(record, dict):
+                raise ValueError(f"{path}:{line_number}: expected an object with an \"in\" field")
+            if 'in' not in record:
+                raise ValueError(f"{path}:{line_number}: missing \"in\" field")
+            if not isinstance(record['in'], (str, list)):
+                raise ValueError(f"{path}:{line_number}: \"in\" must be a string or a list")
+            if not isinstance(record.get('out'), (str, list, type(None))):
+                raise ValueError(f"{path}:{line_number}: \"out\" must be a string or a list")
+
+            yield record['in'], record.get('out')
+
 def main():
+    parser = argparse.ArgumentParser(description="Generate test case files for the current problem")
+    parser.add_argument('--bulk', metavar='PATH',
+                        help='read test cases from an NDJSON file of {"in": ..., "out": ...} records')
+    arguments = parser.parse_args()
+
     # Get problem identifier automatically
     problem_identifier = get_problem_identifier()
     
@@ -108,26 +238,24 @@ def main():
     
     # Create generator
     generator = TestCaseGenerator(problem_identifier)
+
+    if arguments.bulk:
+        # Check the whole file before writing anything, so a bad record doesn't leave a partial run
+        try:
+            cases = list(read_bulk_cases(arguments.bulk))
+        except (OSError, ValueError) as e:
+            print(Colors.error(f"Failed to read test cases: {e}"))
+            sys.exit(1)
+        generator.generate_many(cases)
+        return
     
     # Read input content from stdin
     print(Colors.WARNING + "Enter input test case content (press Ctrl+D or Ctrl+Z when done):" + Colors.END)
-    input_content = []
-    try:
-        while True:
-            line = input()
-            input_content.append(line)
-    except EOFError:
-        input_content = '\n'.join(input_content)
+    input_content = sys.stdin.read().rstrip('\n')
     
     # Optional: read output content
     print(Colors.WARNING + "Enter output test case content (optional, press Ctrl+D or Ctrl+Z when done):" + Colors.END)
-    output_content = []
-    try:
-        while True:
-            line = input()
-            output_content.append(line)
-    except EOFError:
-        output_content = '\n'.join(output_content) if output_content else None
+    output_content = sys.stdin.read().rstrip('\n') or None
     
     # Generate test case
     generator.generate_test_case(input_content, output_content)